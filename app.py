@@ -1,6 +1,14 @@
-from flask import Flask, request, render_template_string, Response
-import pandas as pd
-import io
+from flask import Flask, request, Response
+from markupsafe import Markup, escape
+import numpy as np
+import csv
+import functools
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; fall back to plain NumPy
+    def njit(*args, **kwargs):
+        return lambda func: func
 
 app = Flask(__name__)
 
@@ -25,7 +33,7 @@ HTML_TEMPLATE = """
 
     <div class="text-center mb-4">
         <h1 class="text-primary">⚗️ Stoichiometric Calculator</h1>
-        <p class="lead">Powered by Python, Flask, and Pandas</p>
+        <p class="lead">Powered by Python, Flask, and NumPy</p>
     </div>
 
     <form method="POST" action="/">
@@ -112,95 +120,170 @@ HTML_TEMPLATE = """
 </html>
 """
 
+# Default form values shown before any calculation has been submitted
+DEFAULT_VALS = {
+    "species": ["A (Reactant)", "B (Reactant)", "C (Product)", "D (Inert)"],
+    "nu": ["-1.0", "-2.0", "1.0", "0.0"],
+    "n0": ["100.0", "250.0", "0.0", "50.0"],
+    "mw": ["16.0", "32.0", "44.0", "28.0"],
+    "lim_index": "1",
+    "conversion": "0.5",
+    "multi_conv": "0.2, 0.5, 0.8, 0.9"
+}
+
+# Compile the template once; every response renders from this object
+_TEMPLATE = app.jinja_env.from_string(HTML_TEMPLATE)
+
+# The GET page only depends on the defaults, so render it once up front
+_DEFAULT_GET_HTML = _TEMPLATE.render(vals=DEFAULT_VALS)
+
 # -------------------------------------------------------------------
 # Backend Logic & Stoichiometry Engine
 # -------------------------------------------------------------------
 def process_stoichiometry(form_data):
-    """Core Pandas logic separated from the routing."""
-    df = pd.DataFrame({
-        "Species": form_data.getlist("species"),
-        "Coefficient (ν)": pd.to_numeric(form_data.getlist("nu")),
-        "Initial Feed (mol)": pd.to_numeric(form_data.getlist("n0")),
-        "Molar Mass (g/mol)": pd.to_numeric(form_data.getlist("mw"))
-    })
-    
-    lim_idx = int(form_data.get("lim_index")) - 1
-    conversion = float(form_data.get("conversion"))
-    multi_conv = form_data.get("multi_conv")
+    """Core NumPy logic separated from the routing."""
+    return _compute_cached(
+        tuple(form_data.getlist("species")),
+        tuple(form_data.getlist("nu")),
+        tuple(form_data.getlist("n0")),
+        tuple(form_data.getlist("mw")),
+        form_data.get("lim_index"),
+        form_data.get("conversion"),
+        form_data.get("multi_conv")
+    )
+
+@njit(cache=True)
+def _stoich_kernel(nu, n0, mw, conv_arr, lim_idx, conversion):
+    """Pure float math for the main and comparison tables."""
+    nu_lim = nu[lim_idx]
+    n0_lim = n0[lim_idx]
+
+    # Extent per unit conversion; hoisted so each conversion is one multiply
+    k = n0_lim / abs(nu_lim)
+    xi = k * conversion
+
+    change = nu * xi
+    final = n0 + change
+
+    mole_frac = final / final.sum()
+    mass = final * mw
+    mass_frac = mass / mass.sum()
+
+    # (species x conversions) flow matrix for the comparison table, built in
+    # place so no (N, K) temporaries are allocated
+    comp_matrix = np.outer(nu, conv_arr)
+    comp_matrix *= k
+    comp_matrix += n0.reshape(-1, 1)
+
+    return change, final, mole_frac, mass, mass_frac, comp_matrix
+
+@functools.lru_cache(maxsize=128)
+def _compute_cached(species_tuple, nu_tuple, n0_tuple, mw_tuple, lim_index, conversion, multi_conv):
+    """Keyed on the raw form strings so /download reuses the page's result.
+
+    The returned arrays are shared between cache hits and must not be mutated.
+    """
+    species = list(species_tuple)
+    nu = np.fromiter((float(v) for v in nu_tuple), dtype=np.float64, count=len(nu_tuple))
+    n0 = np.fromiter((float(v) for v in n0_tuple), dtype=np.float64, count=len(n0_tuple))
+    mw = np.fromiter((float(v) for v in mw_tuple), dtype=np.float64, count=len(mw_tuple))
     
-    nu_lim = df.loc[lim_idx, "Coefficient (ν)"]
-    n0_lim = df.loc[lim_idx, "Initial Feed (mol)"]
+    lim_idx = int(lim_index) - 1
+    conversion = float(conversion)
+    conv_list = [float(x.strip()) for x in multi_conv.split(",")]
+    conv = np.array(conv_list, dtype=np.float64)
     
-    if nu_lim >= 0:
+    # Homogeneous C-contiguous float64 buffers, so the kernel gets a single
+    # specialization and NumPy's SIMD loops
+    nu, n0, mw, conv = (np.ascontiguousarray(a, dtype=np.float64) for a in (nu, n0, mw, conv))
+
+    if not 0 <= lim_idx < len(nu):
+        raise ValueError(f"The limiting reactant index must be between 1 and {len(nu)}.")
+    if nu[lim_idx] >= 0:
         raise ValueError("The limiting reactant must have a negative coefficient.")
 
-    xi = (n0_lim * conversion) / abs(nu_lim)
+    change, final, mole_frac, mass, mass_frac, flows = _stoich_kernel(nu, n0, mw, conv, lim_idx, conversion)
 
-    df["Change (mol)"] = df["Coefficient (ν)"] * xi
-    df["Final Flow (mol)"] = df["Initial Feed (mol)"] + df["Change (mol)"]
-    
-    df["Mole Fraction"] = df["Final Flow (mol)"] / df["Final Flow (mol)"].sum()
-    df["Final Mass (g)"] = df["Final Flow (mol)"] * df["Molar Mass (g/mol)"]
-    df["Mass Fraction"] = df["Final Mass (g)"] / df["Final Mass (g)"].sum()
+    main_cols = {
+        "Species": species,
+        "Coefficient (ν)": nu,
+        "Initial Feed (mol)": n0,
+        "Molar Mass (g/mol)": mw,
+        "Change (mol)": change,
+        "Final Flow (mol)": final,
+        "Mole Fraction": mole_frac,
+        "Final Mass (g)": mass,
+        "Mass Fraction": mass_frac
+    }
 
-    conv_list = [float(x.strip()) for x in multi_conv.split(",")]
-    comp_df = pd.DataFrame({"Species": df["Species"], "Final flow": df["Initial Feed (mol)"]})
-    
-    for x in conv_list:
-        xi_temp = (n0_lim * x) / abs(nu_lim)
-        comp_df[f"X = {x}"] = df["Initial Feed (mol)"] + df["Coefficient (ν)"] * xi_temp
+    comp_cols = {"Species": species, "Final flow": n0}
+    for j, x in enumerate(conv_list):
+        comp_cols[f"X = {x}"] = flows[:, j]
+
+    return main_cols, comp_cols
+
+def render_table(columns, fmt, classes):
+    """Render a small results table straight to HTML, bypassing pandas.
 
-    return df, comp_df
+    Numeric columns are formatted with `fmt` in one vectorized call each.
+    """
+    cells = [np.char.mod(fmt, col) if isinstance(col, np.ndarray) else [escape(v) for v in col]
+             for col in columns.values()]
+
+    head = "".join(f"<th>{escape(h)}</th>" for h in columns)
+    body = "".join("<tr>" + "".join(f"<td>{v}</td>" for v in row) + "</tr>" for row in zip(*cells))
+    return Markup(f'<table class="{classes}"><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>')
 
 # -------------------------------------------------------------------
 # Flask Routes
 # -------------------------------------------------------------------
 @app.route("/", methods=["GET", "POST"])
 def index():
-    # Setup default values
-    current_vals = {
-        "species": ["A (Reactant)", "B (Reactant)", "C (Product)", "D (Inert)"],
-        "nu": ["-1.0", "-2.0", "1.0", "0.0"],
-        "n0": ["100.0", "250.0", "0.0", "50.0"],
-        "mw": ["16.0", "32.0", "44.0", "28.0"],
-        "lim_index": "1",
-        "conversion": "0.5",
-        "multi_conv": "0.2, 0.5, 0.8, 0.9"
-    }
-
     if request.method == "POST":
         # Capture current inputs to keep the form populated
-        current_vals["species"] = request.form.getlist("species")
-        current_vals["nu"] = request.form.getlist("nu")
-        current_vals["n0"] = request.form.getlist("n0")
-        current_vals["mw"] = request.form.getlist("mw")
-        current_vals["lim_index"] = request.form.get("lim_index")
-        current_vals["conversion"] = request.form.get("conversion")
-        current_vals["multi_conv"] = request.form.get("multi_conv")
+        current_vals = {
+            "species": request.form.getlist("species"),
+            "nu": request.form.getlist("nu"),
+            "n0": request.form.getlist("n0"),
+            "mw": request.form.getlist("mw"),
+            "lim_index": request.form.get("lim_index"),
+            "conversion": request.form.get("conversion"),
+            "multi_conv": request.form.get("multi_conv")
+        }
 
         try:
-            main_df, comp_df = process_stoichiometry(request.form)
+            main_cols, comp_cols = process_stoichiometry(request.form)
             tables = {
-                "main": main_df.to_html(classes="table table-striped table-hover", float_format="%.3f", index=False),
-                "comp": comp_df.to_html(classes="table table-striped table-hover", float_format="%.2f", index=False)
+                "main": render_table(main_cols, "%.3f", "table table-striped table-hover"),
+                "comp": render_table(comp_cols, "%.2f", "table table-striped table-hover")
             }
-            return render_template_string(HTML_TEMPLATE, vals=current_vals, tables=tables)
+            return _TEMPLATE.render(vals=current_vals, tables=tables)
         except Exception as e:
-            return render_template_string(HTML_TEMPLATE, vals=current_vals, error=str(e))
+            return _TEMPLATE.render(vals=current_vals, error=str(e))
 
-    return render_template_string(HTML_TEMPLATE, vals=current_vals)
+    return _DEFAULT_GET_HTML
 
 @app.route("/download", methods=["POST"])
 def download_csv():
     try:
-        # Re-calculate cleanly with the hidden fields
-        main_df, _ = process_stoichiometry(request.form)
-        
-        csv_buffer = io.StringIO()
-        main_df.to_csv(csv_buffer, index=False)
+        # Hidden fields match the page's inputs, so this is normally a cache hit
+        main_cols, _ = process_stoichiometry(request.form)
+        # Plain Python values so csv.writer formats floats with their repr
+        columns = [c.tolist() if isinstance(c, np.ndarray) else c for c in main_cols.values()]
+
+        # csv.writer returns whatever the "file" returns, so each row comes back as a string
+        class _Echo:
+            def write(self, value):
+                return value
+
+        def generate():
+            writer = csv.writer(_Echo(), lineterminator="\n")
+            yield writer.writerow(main_cols)
+            for row in zip(*columns):
+                yield writer.writerow(row)
         
         return Response(
-            csv_buffer.getvalue(),
+            generate(),
             mimetype="text/csv",
             headers={"Content-disposition": "attachment; filename=stoichiometry_results.csv"}
         )
@@ -210,9 +293,12 @@ def download_csv():
 # -------------------------------------------------------------------
 # Application Runner
 # -------------------------------------------------------------------
+# For production, serve with a multi-worker WSGI server instead, e.g.:
+#     gunicorn -w $(nproc) -k gthread --threads 8 app:app
+# The handlers share no mutable state, so threads and workers are safe.
 if __name__ == "__main__":
     print("\n" + "="*50)
     print("🚀 Starting Flask Server!")
     print("👉 Open your browser and go to: http://127.0.0.1:5000")
     print("="*50 + "\n")
-    app.run(debug=True, use_reloader=False)
+    app.run(debug=False, threaded=True)